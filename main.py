@@ -1,66 +1,644 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import AsyncIterator, List, Optional
-from mcp.server.fastmcp import FastMCP, Context
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional,
+    Tuple,
+)
+from mcp.server.fastmcp import FastMCP
+import dotenv
+import httpx
 import jenkins
+import pydantic_core
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from contextlib import asynccontextmanager
+import asyncio
+import functools
+import logging
 import os
-import sys
-
-def debug_log(message):
-    print(f"DEBUG: {message}", file=sys.stderr)
+import re
+import threading
+import time
+from urllib.parse import quote
+
+# read .env once at import so every later lookup sees the same environment
+dotenv.load_dotenv()
+
+# Log messages take their arguments separately so nothing gets formatted
+# unless the level is enabled; JENKINS_MCP_LOG=DEBUG turns on tracing
+log = logging.getLogger("jenkins_mcp")
+_log_level = (os.environ.get("JENKINS_MCP_LOG") or "WARNING").upper()
+# getLevelName maps known level names to their number, anything else to a str
+if isinstance(logging.getLevelName(_log_level), int):
+    log.setLevel(_log_level)
+else:
+    log.setLevel(logging.WARNING)
+    log.warning("Unknown JENKINS_MCP_LOG level %r, using WARNING", _log_level)
+
+log.debug("Starting Jenkins MCP server...")
+
+# httpx logs every request at INFO, which would flood the server's stderr
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+@dataclass(frozen=True, slots=True)
+class JenkinsConfig:
+    url: str
+    username: str
+    password: str
+    # Upper bound on concurrent requests to Jenkins; keep it at or below the
+    # number of request threads Jenkins serves so bursts queue here instead
+    max_connections: int = 32
+    # Serve the last good listing when Jenkins is unreachable or erroring
+    stale_on_error: bool = True
+
+    @classmethod
+    def from_env(cls) -> "JenkinsConfig":
+        """Read the Jenkins connection settings from the environment
+
+        An API token in JENKINS_API_TOKEN is accepted in place of
+        JENKINS_PASSWORD.
+        """
+        env = os.environ
+        settings = {
+            "JENKINS_URL": env.get("JENKINS_URL"),
+            "JENKINS_USERNAME": env.get("JENKINS_USERNAME"),
+            "JENKINS_PASSWORD": (
+                env.get("JENKINS_PASSWORD") or env.get("JENKINS_API_TOKEN")
+            ),
+        }
+        missing = [name for name, value in settings.items() if not value]
+        if missing:
+            raise ValueError(
+                f"Missing environment variables: {', '.join(missing)}"
+            )
+        raw_max_connections = env.get("JENKINS_MAX_CONNECTIONS", "32")
+        try:
+            max_connections = int(raw_max_connections)
+        except ValueError:
+            max_connections = 0
+        if max_connections < 1:
+            raise ValueError(
+                "JENKINS_MAX_CONNECTIONS must be a whole number of at least 1, "
+                f"got {raw_max_connections!r}"
+            )
+        return cls(
+            url=settings["JENKINS_URL"],
+            username=settings["JENKINS_USERNAME"],
+            password=settings["JENKINS_PASSWORD"],
+            max_connections=max_connections,
+            stale_on_error=env.get("JENKINS_STALE_ON_ERROR", "true").lower()
+            not in ("0", "false", "no"),
+        )
 
-debug_log("Starting Jenkins MCP server...")
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class JenkinsContext:
     client: jenkins.Jenkins
+    session: requests.Session
+    io_pool: ThreadPoolExecutor
+    http: httpx.AsyncClient
+    stale_on_error: bool
+
+
+# Set by the lifespan; tool calls run in tasks spawned after that, so they
+# all see it without FastMCP having to inject a Context argument
+_context: ContextVar[JenkinsContext] = ContextVar("jenkins_context")
+
+
+class TTLCache:
+    """Small thread-safe cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        # Bumped by clear(), so fetches started earlier can tell they are stale
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                return None
+            return value
+
+    def get_stale(self, key: Hashable) -> Any:
+        """Get an entry even if it has expired, as long as it is still held"""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else entry[1]
+
+    def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None
+    ) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                # dicts keep insertion order, so the first key is the oldest
+                del self._data[next(iter(self._data))]
+            expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+            self._data[key] = (expires, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+
+class ConsoleCache:
+    """LRU cache of finished builds' console output, bounded by total length"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._size = 0
+        self._data: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[str]:
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: str) -> None:
+        if len(value) > self.max_size:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._data[key] = value
+        self._size += len(value)
+        while self._size > self.max_size:
+            _, evicted = self._data.popitem(last=False)
+            self._size -= len(evicted)
+
+
+# Fields returned for each build by get_build_history
+BUILD_HISTORY_FIELDS = (
+    "number,displayName,result,building,duration,estimatedDuration,timestamp,url"
+)
+
+# Fields read from a build's test report; captured stdout/stderr of each test
+# case is left out since it usually dwarfs everything else in the report
+TEST_REPORT_TREE = (
+    "totalCount,passCount,failCount,skipCount,duration,"
+    "suites[name,duration,cases[className,name,status,duration,"
+    "errorDetails,errorStackTrace]]"
+)
+
+# GETs that fail to connect, or are answered with one of these while Jenkins
+# (or a proxy in front of it) is overloaded or restarting, are retried with
+# exponential backoff; both the httpx reads and python-jenkins' session use
+# this policy
+RETRY_STATUSES = frozenset({502, 503, 504})
+GET_RETRIES = 3
+RETRY_BACKOFF = 0.2
+
+# Longest a tool call may wait for a build's test report to be published
+MAX_TEST_REPORT_WAIT = 300
+
+# After Jenkins fails to refresh a listing, keep serving the stale copy for
+# this many seconds before trying again, so calls don't each sit through
+# the retries
+STALE_RETRY_AFTER = 5
+
+# Read console logs from Jenkins in chunks of this many bytes
+CONSOLE_CHUNK_SIZE = 64 * 1024
+
+# Logs of finished builds never change, so repeated reads are served locally
+_console_cache = ConsoleCache(max_size=64 * 1024 * 1024)
+
+# Job info barely changes between back-to-back tool calls, so keep it briefly
+_job_info_cache = TTLCache(maxsize=512, ttl=5)
+
+# How many levels of folders list_jobs fetches in its single request
+JOB_LIST_FOLDER_DEPTH = 10
+
+# The job list is polled by dashboards but rarely changes
+_job_list_cache = TTLCache(maxsize=32, ttl=30)
+
+# The queue moves quickly, so only absorb bursts of identical calls
+_queue_cache = TTLCache(maxsize=1, ttl=5)
+
+# Nodes are added or taken offline far less often than they are listed
+_node_cache = TTLCache(maxsize=64, ttl=30)
+
+# Requests currently in flight, keyed by what they fetch
+_inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+
+async def _singleflight(
+    key: Hashable, fetch: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Share one in-flight request between concurrent callers of the same key
+
+    The request runs as its own task and every caller awaits it shielded, so
+    a caller being cancelled does not abort the request for the others.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+def _job_list_tree(depth: int) -> str:
+    """Build a tree= expression that nests ``jobs`` ``depth`` folders deep"""
+    tree = "jobs[name,url,color]"
+    for _ in range(depth):
+        tree = f"jobs[name,url,color,{tree}]"
+    return tree
+
+
+def _flatten_jobs(jobs: List[dict], prefix: str = "") -> List[dict]:
+    """Flatten nested folder listings into one list with full job names"""
+    flat = []
+    for job in jobs:
+        fullname = prefix + job["name"]
+        children = job.get("jobs")
+        entry = {key: value for key, value in job.items() if key != "jobs"}
+        entry["fullname"] = fullname
+        flat.append(entry)
+        if children:
+            flat.extend(_flatten_jobs(children, fullname + "/"))
+    return flat
+
+
+@functools.lru_cache(maxsize=1024)
+def _job_path(job_name: str) -> str:
+    """Build the URL path of a job, e.g. "folder/job" -> "job/folder/job/job/"
+    """
+    return "".join(f"job/{quote(part, safe='')}/" for part in job_name.split("/"))
+
+
+async def _get_json(
+    http: httpx.AsyncClient, path: str, params: Optional[dict] = None
+) -> Any:
+    """GET a Jenkins JSON API endpoint relative to the server URL"""
+    for attempt in range(GET_RETRIES + 1):
+        try:
+            response = await http.get(path, params=params)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            if attempt == GET_RETRIES:
+                raise
+            log.debug("Retrying %s after connect error: %s", path, e)
+        else:
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt == GET_RETRIES
+            ):
+                break
+            log.debug("Retrying %s after HTTP %s", path, response.status_code)
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+    response.raise_for_status()
+    # pydantic-core's Rust parser (already needed by mcp) decodes the raw
+    # bytes noticeably faster than the stdlib json behind response.json()
+    return pydantic_core.from_json(response.content)
+
+
+async def _cached_listing(
+    cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+) -> Any:
+    """Get a listing from ``cache``, refreshing it with ``fetch`` once expired
+
+    If the refresh fails because Jenkins is unreachable or answers with a
+    server error, the last listing fetched is returned instead, so callers
+    ride out restarts and brief outages.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+    generation = cache.generation
+    try:
+        # Callers arriving while a refresh is running wait for it to finish,
+        # unless the cache was cleared since that refresh started
+        value = await _singleflight((key, generation), fetch)
+    except (httpx.TransportError, httpx.HTTPStatusError) as e:
+        if isinstance(e, httpx.HTTPStatusError) and e.response.status_code < 500:
+            raise
+        stale = cache.get_stale(key)
+        if stale is None or not _context.get().stale_on_error:
+            raise
+        log.warning("Serving stale %s listing after Jenkins error: %s", key, e)
+        cache.set(key, stale, ttl=STALE_RETRY_AFTER)
+        return stale
+    # A fetch that was already running when the cache got cleared may have
+    # read the state from before, so it must not repopulate the cache
+    if cache.generation == generation:
+        cache.set(key, value)
+    return value
+
+
+async def _job_info(
+    http: httpx.AsyncClient,
+    job_name: str,
+    tree: Optional[str] = None,
+    coalesce: bool = True,
+) -> dict:
+    """Get job info, optionally only the fields selected by a ``tree=`` query
+
+    Args:
+        http: Async HTTP client bound to the Jenkins server
+        job_name: Name of the job
+        tree: Jenkins tree expression, e.g. "url,lastBuild[number]"
+        coalesce: Share a request already in flight for the same job and tree
+
+    Returns:
+        Job information dictionary
+    """
+    params = {"depth": 0} if tree is None else {"tree": tree}
+
+    def fetch() -> Awaitable[Any]:
+        return _get_json(http, _job_path(job_name) + "api/json", params)
+
+    if not coalesce:
+        return await fetch()
+    return await _singleflight(("job", job_name, tree), fetch)
+
+
+def _build_path(job_name: str, build_number: Optional[int] = None) -> str:
+    """Build the URL path of a build, using the lastBuild permalink by default
+    """
+    build = "lastBuild" if build_number is None else build_number
+    return f"{_job_path(job_name)}{build}/"
+
+
+async def _build_info(
+    http: httpx.AsyncClient,
+    job_name: str,
+    build_number: Optional[int] = None,
+    tree: Optional[str] = None,
+) -> dict:
+    """Get the build information dictionary of a build, defaulting to latest
+
+    Asking for the lastBuild permalink lets Jenkins resolve the latest build
+    itself, saving the round-trip that would otherwise look up its number.
+
+    Args:
+        http: Async HTTP client bound to the Jenkins server
+        job_name: Name of the job
+        build_number: Build number, defaults to latest
+        tree: Optional Jenkins tree expression to fetch only some fields
+
+    Returns:
+        Build information dictionary
+    """
+    params = {"depth": 0} if tree is None else {"tree": tree}
+    return await _singleflight(
+        ("build", job_name, build_number, tree),
+        lambda: _get_json(
+            http, _build_path(job_name, build_number) + "api/json", params
+        ),
+    )
+
+
+async def _cached_job_info(
+    http: httpx.AsyncClient,
+    job_name: str,
+    tree: Optional[str] = None,
+    force_refresh: bool = False,
+) -> dict:
+    """Get job info, reusing a response fetched in the last few seconds
+
+    Args:
+        http: Async HTTP client bound to the Jenkins server
+        job_name: Name of the job
+        tree: Optional Jenkins tree expression to fetch only some fields
+        force_refresh: Skip the cache and any request already in flight,
+            always reading the current state from Jenkins
+
+    Returns:
+        Job information dictionary
+    """
+    key = (job_name, tree)
+    if not force_refresh:
+        job_info = _job_info_cache.get(key)
+        if job_info is not None:
+            return job_info
+    job_info = await _job_info(
+        http, job_name, tree, coalesce=not force_refresh
+    )
+    _job_info_cache.set(key, job_info)
+    return job_info
+
+
+async def _resolve_latest(http: httpx.AsyncClient, job_name: str) -> int:
+    """Get the number of a job's latest build with a minimal tree= query"""
+    job_info = await _cached_job_info(http, job_name, tree="lastBuild[number]")
+    return job_info["lastBuild"]["number"]
+
+
+async def _read_console(
+    http: httpx.AsyncClient,
+    job_name: str,
+    build_number: int,
+    start: int = 0,
+    tail_bytes: Optional[int] = None,
+) -> Tuple[str, bool]:
+    """Stream a build's console log from Jenkins' progressiveText endpoint
+
+    The log is read in chunks; when ``tail_bytes`` is set only that many
+    trailing bytes are kept, so memory stays flat however long the log is.
+
+    Args:
+        http: Async HTTP client bound to the Jenkins server
+        job_name: Name of the job
+        build_number: Build number to read the log of
+        start: Byte offset in the log to start reading from
+        tail_bytes: Only return the last N bytes of the log
+
+    Returns:
+        Tuple of the console output and whether the log is complete, i.e.
+        the build has finished and the log will not change any more
+    """
+    if start < 0:
+        raise ValueError(f"start must be >= 0, got {start}")
+    if tail_bytes is not None and tail_bytes < 0:
+        raise ValueError(f"tail_bytes must be >= 0, got {tail_bytes}")
+
+    path = f"{_job_path(job_name)}{build_number}/logText/progressiveText"
+    output = bytearray()
+    async with http.stream("GET", path, params={"start": start}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(CONSOLE_CHUNK_SIZE):
+            output += chunk
+            if tail_bytes is not None and len(output) > tail_bytes:
+                del output[: len(output) - tail_bytes]
+    text = output.decode(response.charset_encoding or "utf-8", errors="replace")
+    # Jenkins sets X-More-Data while the build is still writing to its log
+    return text, "X-More-Data" not in response.headers
+
+
+async def _fetch_console(
+    http: httpx.AsyncClient,
+    job_name: str,
+    build_number: Optional[int] = None,
+    start: int = 0,
+    tail_bytes: Optional[int] = None,
+) -> str:
+    """Get a build's console output, cached once the build has finished
+
+    Args:
+        http: Async HTTP client bound to the Jenkins server
+        job_name: Name of the job
+        build_number: Build number to read the log of, defaults to latest
+        start: Byte offset in the log to start reading from
+        tail_bytes: Only return the last N bytes of the log
+
+    Returns:
+        Console output as string
+    """
+    # Resolve the number rather than read via the lastBuild permalink, since
+    # the cache key must name a build that will not change underneath it
+    if build_number is None:
+        build_number = await _resolve_latest(http, job_name)
+
+    key = (job_name, build_number, start, tail_bytes)
+    output = _console_cache.get(key)
+    if output is None:
+        output, complete = await _read_console(
+            http, job_name, build_number, start, tail_bytes
+        )
+        if complete:
+            _console_cache.set(key, output)
+    return output
 
 
 @asynccontextmanager
 async def jenkins_lifespan(server: FastMCP) -> AsyncIterator[JenkinsContext]:
     """Manage Jenkins client lifecycle"""
-    debug_log("Starting Jenkins lifespan")
+    log.debug("Starting Jenkins lifespan")
+    session = None
+    io_pool = None
+    http = None
     try:
-        # read .env
-        import dotenv
-        debug_log("Loading environment variables")
-        dotenv.load_dotenv()
-        
-        # Log environment variables (careful with credentials)
-        debug_log(f"JENKINS_URL: {os.environ.get('JENKINS_URL', 'Not set')}")
-        debug_log(f"JENKINS_USERNAME: {'Set' if os.environ.get('JENKINS_USERNAME') else 'Not set'}")
-        debug_log(f"JENKINS_PASSWORD: {'Set' if os.environ.get('JENKINS_PASSWORD') else 'Not set'}")
-        
-        jenkins_url = os.environ["JENKINS_URL"]
-        username = os.environ["JENKINS_USERNAME"]
-        password = os.environ["JENKINS_PASSWORD"]
-        
-        debug_log(f"Connecting to Jenkins at {jenkins_url}")
-        client = jenkins.Jenkins(jenkins_url, username=username, password=password)
-        debug_log("Connected to Jenkins successfully")
-        yield JenkinsContext(client=client)
+        config = JenkinsConfig.from_env()
+        log.debug("Connecting to Jenkins at %s", config.url)
+        client = jenkins.Jenkins(
+            config.url, username=config.username, password=config.password
+        )
+
+        # python-jenkins sends every request through its own requests.Session;
+        # mount a larger keep-alive pool with retries so tool calls reuse
+        # connections instead of paying a TCP+TLS handshake each time.
+        # Gateway errors are retried too, but only for idempotent methods,
+        # so a build trigger (POST) is never sent twice
+        session = client._session
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=config.max_connections,
+            max_retries=Retry(
+                total=GET_RETRIES,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                raise_on_status=False,
+            ),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+        # python-jenkins is blocking, so tools run its calls on a dedicated
+        # pool sized to the session's connection pool rather than on the
+        # event loop or the shared default executor
+        io_pool = ThreadPoolExecutor(
+            max_workers=config.max_connections, thread_name_prefix="jenkins-io"
+        )
+
+        # Read-only API calls go straight through an async client instead;
+        # python-jenkins is only kept for calls that need its crumb handling
+        # Limits are set on the client rather than an explicit transport so
+        # httpx still mounts HTTP(S)_PROXY/NO_PROXY from the environment
+        http = httpx.AsyncClient(
+            base_url=config.url.rstrip("/") + "/",
+            auth=(config.username, config.password),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(10.0, connect=3.0),
+        )
+
+        log.debug("Connected to Jenkins successfully")
+        context = JenkinsContext(
+            client=client,
+            session=session,
+            io_pool=io_pool,
+            http=http,
+            stale_on_error=config.stale_on_error,
+        )
+        token = _context.set(context)
+        try:
+            yield context
+        finally:
+            _context.reset(token)
     except Exception as e:
-        debug_log(f"Error in Jenkins lifespan: {str(e)}")
+        log.debug("Error in Jenkins lifespan: %s", e)
         # Re-raise the exception to properly handle errors
         raise
     finally:
-        debug_log("Exiting Jenkins lifespan")
+        if http is not None:
+            await http.aclose()
+        if io_pool is not None:
+            io_pool.shutdown(wait=False, cancel_futures=True)
+        if session is not None:
+            session.close()
+        log.debug("Exiting Jenkins lifespan")
+
+
+async def _run(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking Jenkins call on the lifespan's I/O thread pool"""
+    io_pool = _context.get().io_pool
+    return await asyncio.get_running_loop().run_in_executor(
+        io_pool, functools.partial(fn, *args, **kwargs)
+    )
 
 
 mcp = FastMCP("jenkins-mcp", lifespan=jenkins_lifespan)
-debug_log("FastMCP initialized")
+log.debug("FastMCP initialized")
 
 @mcp.tool()
-def list_jobs(ctx: Context) -> List[dict]:
-    """List all Jenkins jobs"""
-    debug_log("Listing Jenkins jobs")
-    client = ctx.request_context.lifespan_context.client
-    return client.get_jobs()
+async def list_jobs(
+    folder_path: Optional[str] = None, query: Optional[str] = None
+) -> List[dict]:
+    """List all Jenkins jobs, including jobs inside folders
+
+    Args:
+        folder_path: Only list jobs inside this folder, e.g. "team/services"
+        query: Only list jobs whose full name contains this text, ignoring case
+
+    Returns:
+        List of jobs with their full names
+    """
+    log.debug("Listing Jenkins jobs in: %s", folder_path or "root")
+    folder = (folder_path or "").strip("/")
+
+    async def fetch() -> List[dict]:
+        http = _context.get().http
+        path = _job_path(folder) if folder else ""
+        # One tree= request returns the whole folder hierarchy at once
+        tree = _job_list_tree(JOB_LIST_FOLDER_DEPTH)
+        data = await _get_json(http, path + "api/json", {"tree": tree})
+        prefix = folder + "/" if folder else ""
+        return _flatten_jobs(data.get("jobs", []), prefix)
+
+    jobs = await _cached_listing(_job_list_cache, ("jobs", folder), fetch)
+    if query:
+        pattern = re.compile(re.escape(query), re.IGNORECASE)
+        jobs = [job for job in jobs if pattern.search(job["fullname"])]
+    return jobs
 
 
 @mcp.tool()
-def trigger_build(
-    ctx: Context, job_name: str, parameters: Optional[dict] = None
+async def trigger_build(
+    job_name: str, parameters: Optional[dict] = None
 ) -> dict:
     """Trigger a Jenkins build
 
@@ -71,23 +649,20 @@ def trigger_build(
     Returns:
         Dictionary containing build information including the build number
     """
-    debug_log(f"Triggering build for job: {job_name}")
-    if not isinstance(job_name, str):
-        raise ValueError(f"job_name must be a string, got {type(job_name)}")
-    if parameters is not None and not isinstance(parameters, dict):
-        raise ValueError(
-            f"parameters must be a dictionary or None, got {type(parameters)}"
-        )
-
-    client = ctx.request_context.lifespan_context.client
+    log.debug("Triggering build for job: %s", job_name)
+    client = _context.get().client
+    http = _context.get().http
 
-    # First verify the job exists
+    # First verify the job exists; nextBuildNumber must be fresh, so bypass
+    # the cache and fetch just the two fields used below
     try:
-        job_info = client.get_job_info(job_name)
+        job_info = await _cached_job_info(
+            http, job_name, tree="url,nextBuildNumber", force_refresh=True
+        )
         if not job_info:
             raise ValueError(f"Job {job_name} not found")
-    except Exception as e:
-        debug_log(f"Error checking job {job_name}: {str(e)}")
+    except httpx.HTTPError as e:
+        log.debug("Error checking job %s: %s", job_name, e)
         raise ValueError(f"Error checking job {job_name}: {str(e)}")
 
     # Then try to trigger the build
@@ -96,8 +671,12 @@ def trigger_build(
         next_build_number = job_info['nextBuildNumber']
         
         # Trigger the build
-        queue_id = client.build_job(job_name, parameters=parameters)
-        debug_log(f"Build triggered for {job_name}, queue ID: {queue_id}")
+        queue_id = await _run(
+            client.build_job, job_name, parameters=parameters
+        )
+        log.debug("Build triggered for %s, queue ID: %s", job_name, queue_id)
+        # The new build is now in the queue, so a cached listing is stale
+        _queue_cache.clear()
         
         return {
             "status": "triggered",
@@ -107,14 +686,14 @@ def trigger_build(
             "job_url": job_info["url"],
             "build_url": f"{job_info['url']}{next_build_number}/"
         }
-    except Exception as e:
-        debug_log(f"Error triggering build for {job_name}: {str(e)}")
+    except (jenkins.JenkinsException, requests.RequestException) as e:
+        log.debug("Error triggering build for %s: %s", job_name, e)
         raise ValueError(f"Error triggering build for {job_name}: {str(e)}")
 
 
 @mcp.tool()
-def get_build_status(
-    ctx: Context, job_name: str, build_number: Optional[int] = None
+async def get_build_status(
+    job_name: str, build_number: Optional[int] = None
 ) -> dict:
     """Get build status
 
@@ -125,35 +704,36 @@ def get_build_status(
     Returns:
         Build information dictionary
     """
-    debug_log(f"Getting build status for job: {job_name}, build: {build_number or 'latest'}")
-    client = ctx.request_context.lifespan_context.client
-    if build_number is None:
-        build_number = client.get_job_info(job_name)["lastBuild"]["number"]
-    return client.get_build_info(job_name, build_number)
+    log.debug("Getting build status for job: %s, build: %s", job_name, build_number or "latest")
+    http = _context.get().http
+    return await _build_info(http, job_name, build_number)
 
 
 @mcp.tool()
-def get_build_logs(
-    ctx: Context, job_name: str, build_number: Optional[int] = None
+async def get_build_logs(
+    job_name: str,
+    build_number: Optional[int] = None,
+    start: int = 0,
+    tail_bytes: Optional[int] = None,
 ) -> str:
     """Get build logs for a specific build
 
     Args:
         job_name: Name of the job
         build_number: Build number to get logs for, defaults to latest
+        start: Byte offset in the log to start reading from, defaults to 0
+        tail_bytes: Only return the last N bytes of the log, defaults to all
 
     Returns:
         Build logs as a string
     """
-    debug_log(f"Getting build logs for job: {job_name}, build: {build_number or 'latest'}")
-    client = ctx.request_context.lifespan_context.client
-    if build_number is None:
-        build_number = client.get_job_info(job_name)["lastBuild"]["number"]
-    return client.get_build_console_output(job_name, build_number)
+    log.debug("Getting build logs for job: %s, build: %s", job_name, build_number or "latest")
+    http = _context.get().http
+    return await _fetch_console(http, job_name, build_number, start, tail_bytes)
 
 
 @mcp.tool()
-def get_job_config(ctx: Context, job_name: str) -> str:
+async def get_job_config(job_name: str) -> str:
     """Get Jenkins job configuration in XML format
 
     Args:
@@ -162,34 +742,39 @@ def get_job_config(ctx: Context, job_name: str) -> str:
     Returns:
         Job configuration as XML string
     """
-    debug_log(f"Getting job config for: {job_name}")
-    client = ctx.request_context.lifespan_context.client
-    return client.get_job_config(job_name)
+    log.debug("Getting job config for: %s", job_name)
+    http = _context.get().http
+    response = await http.get(_job_path(job_name) + "config.xml")
+    response.raise_for_status()
+    return response.text
 
 
 @mcp.tool()
-def get_build_console_output(
-    ctx: Context, job_name: str, build_number: Optional[int] = None
+async def get_build_console_output(
+    job_name: str,
+    build_number: Optional[int] = None,
+    start: int = 0,
+    tail_bytes: Optional[int] = None,
 ) -> str:
     """Get build console output
 
     Args:
         job_name: Name of the job
         build_number: Build number to get console output for, defaults to latest
+        start: Byte offset in the log to start reading from, defaults to 0
+        tail_bytes: Only return the last N bytes of the log, defaults to all
 
     Returns:
         Console output as string
     """
-    debug_log(f"Getting console output for job: {job_name}, build: {build_number or 'latest'}")
-    client = ctx.request_context.lifespan_context.client
-    if build_number is None:
-        build_number = client.get_job_info(job_name)["lastBuild"]["number"]
-    return client.get_build_console_output(job_name, build_number)
+    log.debug("Getting console output for job: %s, build: %s", job_name, build_number or "latest")
+    http = _context.get().http
+    return await _fetch_console(http, job_name, build_number, start, tail_bytes)
 
 
 @mcp.tool()
-def get_build_history(
-    ctx: Context, job_name: str, limit: Optional[int] = 10
+async def get_build_history(
+    job_name: str, limit: Optional[int] = 10
 ) -> List[dict]:
     """Get build history for a job
 
@@ -198,30 +783,38 @@ def get_build_history(
         limit: Maximum number of builds to return, defaults to 10
 
     Returns:
-        List of build information dictionaries
+        List of build summaries (number, result, duration, timestamp, url, ...)
     """
-    debug_log(f"Getting build history for job: {job_name}, limit: {limit}")
-    client = ctx.request_context.lifespan_context.client
-    job_info = client.get_job_info(job_name)
-    builds = job_info.get("builds", [])[:limit]
-    return [client.get_build_info(job_name, build["number"]) for build in builds]
+    log.debug("Getting build history for job: %s, limit: %s", job_name, limit)
+    http = _context.get().http
+    # One request returns every build's summary, sliced by Jenkins itself,
+    # instead of a separate get_build_info round-trip per build
+    tree = f"builds[{BUILD_HISTORY_FIELDS}]"
+    if limit is not None:
+        tree += f"{{0,{limit}}}"
+    job_info = await _cached_job_info(http, job_name, tree=tree)
+    return job_info.get("builds", [])[:limit]
 
 
 @mcp.tool()
-def get_queue_info(ctx: Context) -> List[dict]:
+async def get_queue_info() -> List[dict]:
     """Get information about items in the Jenkins queue
 
     Returns:
         List of queue items with their details
     """
-    debug_log("Getting Jenkins queue info")
-    client = ctx.request_context.lifespan_context.client
-    queue_info = client.get_queue_info()
-    return queue_info
+    log.debug("Getting Jenkins queue info")
+
+    async def fetch() -> List[dict]:
+        http = _context.get().http
+        queue_info = await _get_json(http, "queue/api/json", {"depth": 0})
+        return queue_info["items"]
+
+    return await _cached_listing(_queue_cache, ("queue",), fetch)
 
 
 @mcp.tool()
-def get_node_info(ctx: Context, node_name: Optional[str] = None) -> dict:
+async def get_node_info(node_name: Optional[str] = None) -> dict:
     """Get information about Jenkins nodes/slaves
 
     Args:
@@ -230,28 +823,50 @@ def get_node_info(ctx: Context, node_name: Optional[str] = None) -> dict:
     Returns:
         Dictionary containing node information
     """
-    debug_log(f"Getting node info for: {node_name or 'all nodes'}")
-    client = ctx.request_context.lifespan_context.client
-    if node_name:
-        return client.get_node_info(node_name)
-    return client.get_nodes()
+    log.debug("Getting node info for: %s", node_name or "all nodes")
+    if node_name == "Built-In Node":
+        node_name = "(master)"
+
+    async def fetch() -> Any:
+        http = _context.get().http
+        if node_name:
+            return await _get_json(
+                http, f"computer/{quote(node_name, safe='')}/api/json", {"depth": 0}
+            )
+        nodes = await _get_json(
+            http, "computer/api/json", {"tree": "computer[displayName,offline]"}
+        )
+        return [
+            {"name": node["displayName"], "offline": node["offline"]}
+            for node in nodes["computer"]
+        ]
+
+    return await _cached_listing(_node_cache, ("nodes", node_name), fetch)
 
 
 @mcp.tool()
-def get_job_statistics(ctx: Context, job_name: str) -> dict:
+async def get_job_statistics(job_name: str) -> dict:
     """Get statistics for a Jenkins job
 
     Args:
         job_name: Name of the job
 
     Returns:
-        Dictionary containing job statistics
+        Dictionary containing job statistics. Jenkins only lists a job's
+        newest 100 builds, so total_builds counts at most 100
     """
-    debug_log(f"Getting job statistics for: {job_name}")
-    client = ctx.request_context.lifespan_context.client
-    job_info = client.get_job_info(job_name)
+    log.debug("Getting job statistics for: %s", job_name)
+    http = _context.get().http
+    # Counting allBuilds would make Jenkins load every retained build record
+    # on each call, so the count stays within the newest 100 builds
+    job_info = await _cached_job_info(
+        http,
+        job_name,
+        tree="builds[number],lastBuild[number,result,duration,timestamp],"
+        "nextBuildNumber,inQueue,concurrentBuild,disabled",
+    )
     return {
-        "total_builds": job_info.get("builds", []),
+        "total_builds": len(job_info.get("builds", [])),
         "last_build_number": job_info.get("lastBuild", {}).get("number"),
         "last_build_status": job_info.get("lastBuild", {}).get("result"),
         "last_build_duration": job_info.get("lastBuild", {}).get("duration"),
@@ -264,36 +879,83 @@ def get_job_statistics(ctx: Context, job_name: str) -> dict:
 
 
 @mcp.tool()
-def get_build_test_results(
-    ctx: Context, job_name: str, build_number: Optional[int] = None
+async def get_build_test_results(
+    job_name: str, build_number: Optional[int] = None, wait_seconds: float = 0
 ) -> dict:
     """Get test results for a specific build
 
     Args:
         job_name: Name of the job
         build_number: Build number to get test results for, defaults to latest
+        wait_seconds: Keep polling for up to this long (at most 300 seconds)
+            until the build has published its test report, defaults to not
+            waiting
 
     Returns:
         Dictionary containing test results
     """
-    debug_log(f"Getting test results for job: {job_name}, build: {build_number or 'latest'}")
-    client = ctx.request_context.lifespan_context.client
-    if build_number is None:
-        build_number = client.get_job_info(job_name)["lastBuild"]["number"]
-    build_info = client.get_build_info(job_name, build_number)
-    test_report = build_info.get("testReport", {})
+    log.debug("Getting test results for job: %s, build: %s", job_name, build_number or "latest")
+    if not 0 <= wait_seconds <= MAX_TEST_REPORT_WAIT:
+        raise ValueError(
+            f"wait_seconds must be between 0 and {MAX_TEST_REPORT_WAIT}, "
+            f"got {wait_seconds}"
+        )
+    http = _context.get().http
+    # Test results live on the build's testReport endpoint, which Jenkins
+    # only serves (404 otherwise) when the build published a report
+    deadline = time.monotonic() + wait_seconds
+    delay = 0.5
+    finished = False
+    while True:
+        try:
+            test_report = await _get_json(
+                http,
+                _build_path(job_name, build_number) + "testReport/api/json",
+                {"tree": TEST_REPORT_TREE},
+            )
+            break
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 404:
+                raise
+            if finished:
+                test_report = {}
+                break
+            # A missing job or build is also a 404 here; looking the build
+            # up raises for those instead of reporting zero tests
+            build_info = await _build_info(
+                http, job_name, build_number, tree="number,building"
+            )
+            # Keep polling this build even if a newer one starts meanwhile
+            build_number = build_info["number"]
+            if not build_info.get("building"):
+                # A finished build will not publish a report any more, but
+                # it may have done so right before finishing: read once more
+                finished = True
+                if wait_seconds > 0:
+                    continue
+                test_report = {}
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                test_report = {}
+                break
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 5)
+    passed = test_report.get("passCount", 0)
+    failed = test_report.get("failCount", 0)
+    skipped = test_report.get("skipCount", 0)
     return {
-        "total_tests": test_report.get("totalCount", 0),
-        "passed_tests": test_report.get("passCount", 0),
-        "failed_tests": test_report.get("failCount", 0),
-        "skipped_tests": test_report.get("skipCount", 0),
+        "total_tests": test_report.get("totalCount", passed + failed + skipped),
+        "passed_tests": passed,
+        "failed_tests": failed,
+        "skipped_tests": skipped,
         "test_duration": test_report.get("duration", 0),
         "test_suites": test_report.get("suites", [])
     }
 
 
 @mcp.tool()
-def get_job_health(ctx: Context, job_name: str) -> dict:
+async def get_job_health(job_name: str) -> dict:
     """Get health information for a Jenkins job
 
     Args:
@@ -302,9 +964,13 @@ def get_job_health(ctx: Context, job_name: str) -> dict:
     Returns:
         Dictionary containing job health information
     """
-    debug_log(f"Getting job health for: {job_name}")
-    client = ctx.request_context.lifespan_context.client
-    job_info = client.get_job_info(job_name)
+    log.debug("Getting job health for: %s", job_name)
+    http = _context.get().http
+    job_info = await _cached_job_info(
+        http,
+        job_name,
+        tree="healthScore,healthReport[*],lastBuild[number,result,url,timestamp]",
+    )
     health_report = job_info.get("healthReport", [])
     return {
         "health_score": job_info.get("healthScore", 0),
@@ -317,7 +983,7 @@ def get_job_health(ctx: Context, job_name: str) -> dict:
 
 
 @mcp.tool()
-def get_job_status(ctx: Context, job_name: str) -> dict:
+async def get_job_status(job_name: str) -> dict:
     """Get current status of a Jenkins job
 
     Args:
@@ -326,9 +992,14 @@ def get_job_status(ctx: Context, job_name: str) -> dict:
     Returns:
         Dictionary containing job status information
     """
-    debug_log(f"Getting job status for: {job_name}")
-    client = ctx.request_context.lifespan_context.client
-    job_info = client.get_job_info(job_name)
+    log.debug("Getting job status for: %s", job_name)
+    http = _context.get().http
+    job_info = await _cached_job_info(
+        http,
+        job_name,
+        tree="url,nextBuildNumber,inQueue,concurrentBuild,disabled,"
+        "lastBuild[number,result,url]",
+    )
     return {
         "name": job_name,
         "url": job_info["url"],
@@ -343,8 +1014,8 @@ def get_job_status(ctx: Context, job_name: str) -> dict:
 
 
 @mcp.tool()
-def get_build_parameters(
-    ctx: Context, job_name: str, build_number: Optional[int] = None
+async def get_build_parameters(
+    job_name: str, build_number: Optional[int] = None
 ) -> dict:
     """Get parameters used in a specific build
 
@@ -355,15 +1026,18 @@ def get_build_parameters(
     Returns:
         Dictionary of build parameters
     """
-    debug_log(f"Getting build parameters for job: {job_name}, build: {build_number or 'latest'}")
-    client = ctx.request_context.lifespan_context.client
-    if build_number is None:
-        build_number = client.get_job_info(job_name)["lastBuild"]["number"]
-    build_info = client.get_build_info(job_name, build_number)
-    return build_info.get("actions", [{}])[0].get("parameters", [])
+    log.debug("Getting build parameters for job: %s, build: %s", job_name, build_number or "latest")
+    http = _context.get().http
+    build_info = await _build_info(
+        http, job_name, build_number, tree="actions[parameters[name,value]]"
+    )
+    for action in build_info.get("actions", []):
+        if action and "parameters" in action:
+            return action["parameters"]
+    return []
 
 
 # Make sure the MCP server stays running
 if __name__ == "__main__":
     mcp.run()
-    debug_log("Running MCP server...")
\ No newline at end of file
+    log.debug("Running MCP server...")
\ No newline at end of file